@@ -0,0 +1,333 @@
+import difflib
+import hashlib
+import inspect
+import json
+import re
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Optional
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "ai-test-cli"
+DEFAULT_TTL = 7 * 86400  # one week
+
+
+class LLMCache:
+    """
+    On-disk cache for LLM responses keyed by (model, prompt).
+
+    Repeated invocations on the same class with the same model skip the
+    network round-trip entirely and return the stored completion. Entries
+    are plain JSON files named after the sha256 of the request, so the
+    cache survives restarts and needs no extra dependencies.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cached entries.
+        ttl (int): Time-to-live for entries in seconds.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL):
+        """
+        Initialize the cache, creating the cache directory if needed.
+
+        Args:
+            cache_dir (Path, optional): Directory for cached entries.
+                Defaults to ~/.cache/ai-test-cli.
+            ttl (int, optional): Entry time-to-live in seconds. Defaults to 7 days.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """
+        Compute the cache key for a (model, prompt) pair.
+
+        Args:
+            model (str): The model identifier.
+            prompt (str): The full prompt sent to the model.
+
+        Returns:
+            str: A hex sha256 digest uniquely identifying the request.
+        """
+        payload = json.dumps({"model": model, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _prefix_digest(prompt: str, dynamic: str) -> str:
+        """
+        Hash the static portion of a prompt (everything before the dynamic
+        block).
+
+        Instructions, the example test and context files all live in this
+        prefix, so its digest changes whenever any of them do.
+
+        Args:
+            prompt (str): The full prompt sent to the model.
+            dynamic (str): The request-specific suffix of the prompt.
+
+        Returns:
+            str: A hex sha256 digest of the prompt minus its dynamic suffix.
+        """
+        prefix = prompt[:len(prompt) - len(dynamic)] if prompt.endswith(dynamic) else prompt
+        return hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): The key returned by make_key.
+
+        Returns:
+            Optional[str]: The cached response, or None on miss or expiry.
+        """
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return entry.get("response")
+
+    def set(self, key: str, model: str, prompt: str, response: str,
+            dynamic: Optional[str] = None):
+        """
+        Store a response in the cache.
+
+        The entry is written to a temporary file and renamed into place so
+        concurrent invocations never observe a partial entry.
+
+        Args:
+            key (str): The key returned by make_key.
+            model (str): The model identifier.
+            prompt (str): The prompt that produced the response.
+            response (str): The generated response to store.
+            dynamic (str, optional): The request-specific portion of the
+                prompt, stored for similarity matching. Defaults to None.
+        """
+        entry = {"model": model, "prompt": prompt, "response": response, "created": time.time()}
+        if dynamic is not None:
+            entry["dynamic"] = dynamic
+            entry["prefix"] = self._prefix_digest(prompt, dynamic)
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def lookup(self, model: str, prompt: str, dynamic: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a response for a (model, prompt) pair.
+
+        Args:
+            model (str): The model identifier.
+            prompt (str): The full prompt sent to the model.
+            dynamic (str, optional): The request-specific portion of the
+                prompt; unused for exact matching. Defaults to None.
+
+        Returns:
+            Optional[str]: The cached response, or None on miss.
+        """
+        return self.get(self.make_key(model, prompt))
+
+    def store(self, model: str, prompt: str, response: str, dynamic: Optional[str] = None):
+        """
+        Store a response for a (model, prompt) pair.
+
+        Args:
+            model (str): The model identifier.
+            prompt (str): The prompt that produced the response.
+            response (str): The generated response to store.
+            dynamic (str, optional): The request-specific portion of the
+                prompt, stored for similarity matching. Defaults to None.
+        """
+        self.set(self.make_key(model, prompt), model, prompt, response, dynamic)
+
+    def _entry_path(self, key: str) -> Path:
+        """
+        Return the file path backing a cache key.
+
+        Args:
+            key (str): The key returned by make_key.
+
+        Returns:
+            Path: Path of the JSON file holding the entry.
+        """
+        return self.cache_dir / f"{key}.json"
+
+
+class SemanticLLMCache(LLMCache):
+    """
+    Cache that also matches near-duplicate prompts for the same model.
+
+    Iterating users regenerate tests after trivial edits (whitespace,
+    comments, a renamed variable) that produce a different exact key but an
+    essentially identical prompt. On an exact miss this cache compares the
+    whitespace-normalized prompt against the stored entries with difflib
+    and returns the closest response above a similarity threshold.
+
+    Attributes:
+        threshold (float): Minimum similarity ratio (0..1) for a fuzzy hit.
+    """
+
+    DEFAULT_THRESHOLD = 0.92
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL,
+                 threshold: float = DEFAULT_THRESHOLD):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            cache_dir (Path, optional): Directory for cached entries.
+                Defaults to ~/.cache/ai-test-cli.
+            ttl (int, optional): Entry time-to-live in seconds. Defaults to 7 days.
+            threshold (float, optional): Minimum similarity ratio for a fuzzy
+                hit. Defaults to 0.92.
+        """
+        super().__init__(cache_dir, ttl)
+        self.threshold = threshold
+
+    def lookup(self, model: str, prompt: str, dynamic: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a response, falling back to nearest-neighbor matching.
+
+        Similarity is computed over the request-specific portion only: the
+        full prompt shares a multi-KB static preamble (and session context)
+        across all entries, which would dominate the ratio and let two
+        different small classes match each other. Candidates are first
+        restricted to entries whose static prefix is byte-identical, so a
+        run with different instructions, example or context never reuses a
+        response produced under the old ones.
+
+        Args:
+            model (str): The model identifier.
+            prompt (str): The full prompt sent to the model.
+            dynamic (str, optional): The request-specific portion of the
+                prompt to compare. Falls back to the full prompt when absent.
+
+        Returns:
+            Optional[str]: The exact or nearest cached response above the
+            threshold, or None on miss.
+        """
+        hit = super().lookup(model, prompt)
+        if hit is not None:
+            return hit
+        if dynamic is None:
+            dynamic = prompt
+        return self._nearest(model, dynamic, self._prefix_digest(prompt, dynamic))
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Collapse whitespace so trivial formatting edits compare as equal.
+
+        Args:
+            text (str): The text to normalize.
+
+        Returns:
+            str: The text with all whitespace runs reduced to single spaces.
+        """
+        return re.sub(r"\s+", " ", text).strip()
+
+    def _nearest(self, model: str, dynamic: str, prefix: str) -> Optional[str]:
+        """
+        Scan stored entries for the closest dynamic block above the threshold.
+
+        Only entries sharing the exact static prefix are candidates; a
+        similar class generated under different instructions is not a hit.
+        Entries written without the dynamic/prefix fields (older cache
+        files) are skipped rather than compared on their full prompt, since
+        the shared prefix would produce false matches.
+
+        Args:
+            model (str): The model identifier to match entries against.
+            dynamic (str): The request-specific prompt portion to compare.
+            prefix (str): Digest of the static prefix entries must share.
+
+        Returns:
+            Optional[str]: The best matching response, or None if no entry
+            is similar enough.
+        """
+        normalized = self._normalize(dynamic)
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(normalized)
+        best_ratio, best_response = self.threshold, None
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if entry.get("model") != model or "dynamic" not in entry:
+                continue
+            if entry.get("prefix") != prefix:
+                continue
+            if time.time() - entry.get("created", 0) > self.ttl:
+                continue
+            matcher.set_seq1(self._normalize(entry["dynamic"]))
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best_ratio, best_response = ratio, entry.get("response")
+        return best_response
+
+
+def cached(func: Callable) -> Callable:
+    """
+    Decorator adding cache lookup around a TestGenerator generate method.
+
+    The wrapped method is only called on a cache miss; its result is then
+    stored for subsequent invocations. Both plain and coroutine methods are
+    supported. Generators with no cache attached (``self.cache is None``)
+    behave exactly as before.
+
+    Args:
+        func (Callable): The generate method to wrap.
+
+    Returns:
+        Callable: The cache-aware wrapper.
+    """
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(self, prompt: str, system: Optional[str] = None,
+                          on_chunk: Optional[Callable[[str], None]] = None) -> str:
+            cache = self.cache
+            if cache is None:
+                return await func(self, prompt, system=system, on_chunk=on_chunk)
+            # The prompt argument is the request-specific block; the shared
+            # system prefix joins it for exact keys but is kept out of
+            # similarity comparisons.
+            full_prompt = (system or "") + prompt
+            hit = cache.lookup(self.model_name, full_prompt, dynamic=prompt)
+            if hit is not None:
+                if on_chunk:
+                    on_chunk(hit)
+                return hit
+            result = await func(self, prompt, system=system, on_chunk=on_chunk)
+            cache.store(self.model_name, full_prompt, result, dynamic=prompt)
+            return result
+    else:
+        @wraps(func)
+        def wrapper(self, prompt: str, system: Optional[str] = None,
+                    on_chunk: Optional[Callable[[str], None]] = None) -> str:
+            cache = self.cache
+            if cache is None:
+                return func(self, prompt, system=system, on_chunk=on_chunk)
+            full_prompt = (system or "") + prompt
+            hit = cache.lookup(self.model_name, full_prompt, dynamic=prompt)
+            if hit is not None:
+                if on_chunk:
+                    on_chunk(hit)
+                return hit
+            result = func(self, prompt, system=system, on_chunk=on_chunk)
+            cache.store(self.model_name, full_prompt, result, dynamic=prompt)
+            return result
+
+    return wrapper
@@ -1,11 +1,96 @@
+import ast
+import asyncio
+import functools
+import hashlib
+import random
 import textwrap
+import types
 from enum import Enum
-from typing import Optional, List, Union
+from typing import Callable, Optional, List, Tuple, Union
 
 from rich.console import Console
 
+from test_generator.cache import LLMCache, SemanticLLMCache
 from test_generator.generators import TestGenerator, AnthropicTestGenerator, OpenAITestGenerator, OllamaTestGenerator
-from test_generator.settings import Settings
+from test_generator.settings import get_settings
+
+# Dedented once at import time: the template is static, so scanning it for
+# common leading whitespace on every generation would be wasted work, and a
+# byte-identical template keeps response-cache keys stable across runs.
+# All guidance plus the session-stable inputs (context, example,
+# instructions — fixed by the -c/-e/-i flags for a whole batch) form the
+# cacheable prefix; only the per-file class code is appended at the end, so
+# providers with prefix caching reuse everything but the class across files.
+_PROMPT_STATIC = textwrap.dedent("""
+    You are an AI model designed to help write unit tests for a provided class. The user will supply one or two pieces of information:
+    1. A class for which unit tests need to be written.
+    2. (Optional) An example unit tests class that demonstrates the structure and style of the tests.
+    3. (Optional) The contextual code to better understand the class from point 1.
+
+    Your task is to generate unit tests for the provided class. If an example unit tests class is provided, ensure that the tests adhere to the same style, structure, and level of detail as the example. Additionally, use the Given-When-Then format to explain each test case and ensure that edge cases are considered. Follow best practices for writing tests, ensuring the generated code is clean and easy for developers to read.
+
+    **Instructions:**
+
+    1. Detect the programming language of the provided class.
+    2. Analyze the provided class to understand its methods and functionalities.
+    3. (If provided) Review the example unit tests class to understand its structure, naming conventions, and testing approach.
+    4. Write unit tests for the provided class, ensuring each method is adequately tested, including edge cases.
+    5. Use the Given-When-Then format to explain each test:
+       - **Given**: The initial context or state.
+       - **When**: The action or event that triggers the behavior.
+       - **Then**: The expected outcome or result.
+    6. Use appropriate libraries, frameworks, and patterns from the detected programming language to write the tests.
+    7. Follow best practices for writing unit tests, including:
+       - Clear naming conventions
+       - Proper use of setup and teardown methods
+       - Comprehensive assertions
+       - Test isolation (ensure tests don't depend on each other)
+       - Efficient test design to avoid unnecessarily slow tests
+    8. Implement mocking and dependency injection where necessary to isolate the unit under test.
+    9. Use parameterized tests when appropriate to test multiple scenarios with the same test logic.
+    10. Aim for high code coverage (e.g., 80% or higher) and include a comment in the code about the estimated coverage achieved.
+    11. Add code comments to explain complex test setups or assertions.
+    12. Include tests for error scenarios and exception handling.
+    13. Consider how the tests would run in a Continuous Integration (CI) environment and add any necessary setup or configuration as code or configuration files.
+    14. Ensure the tests are clear, readable, and maintain consistency.
+    15. Include necessary imports, setup methods, and assertions. If an example unit tests class is provided, follow its conventions.
+
+    **Output:**
+
+    Generate a unit tests class for the provided class, and if an example is provided, format it similarly to the example unit tests class. Include Given-When-Then explanations for each test case as code comments, covering both typical scenarios and edge cases. Ensure the code follows best practices, is clean, and easy to read. Use the appropriate libraries and patterns from the detected programming language.
+
+    The output should contain ONLY the following, without any additional explanation or comments from the AI:
+    1. The complete code for the unit tests, including imports and any necessary setup.
+    2. A code comment about the estimated code coverage achieved.
+    3. Any necessary setup or configuration for running in a CI environment, as code or configuration files.
+    4. Code comments explaining complex test setups or assertions.
+
+    Ensure that the generated tests are isolated, efficient, and cover error scenarios. Use mocking and dependency injection where appropriate, and implement parameterized tests for multiple similar scenarios. Do not include any text or explanations outside of the code and code comments.
+    """)
+
+_PROMPT_SESSION_TEMPLATE = textwrap.dedent("""
+    # Inputs
+
+    - **(Optional) Contextual code:**
+    ```
+    {context_code}
+    ```
+
+    - **(Optional) Example Unit Tests Class:**
+    ```
+    {sample}
+    ```
+
+    **Additional instructions:**
+    {instruction}
+    """)
+
+_PROMPT_CLASS_TEMPLATE = textwrap.dedent("""
+    - **Provided Class:**
+    ```
+    {class_code}
+    ```
+    """)
 
 
 class ModelType(Enum):
@@ -22,6 +107,89 @@ class ModelType(Enum):
     OLLAMA = "ollama"
 
 
+_MAX_OUTPUT_TOKENS = 4096
+
+# Approximate context windows for the supported backends. Staying under
+# these bounds avoids a rejected request (and the retry round-trip it
+# forces) and caps the input-token cost at a known bound.
+_MODEL_TOKEN_LIMITS = {
+    ModelType.SONNET: 200_000,
+    ModelType.GPT4: 128_000,
+    ModelType.OLLAMA: 32_000,
+}
+
+
+# Concurrency cap for the per-chunk fan-out when a class is split across
+# several prompts; deliberately below the provider rate limiters so one
+# oversized file cannot monopolize a batch run's request slots.
+_CHUNK_CONCURRENCY = 3
+
+_MAX_RETRIES = 3
+_RETRY_BASE_DELAY = 1.0
+
+
+async def _call_with_retry(request: Callable):
+    """
+    Await a request, retrying transient provider errors with backoff.
+
+    Rate-limit (429) and server-side (5xx) failures are retried with
+    exponential backoff plus jitter so concurrent chunk requests don't
+    retry in lockstep; anything else propagates immediately.
+
+    Args:
+        request (Callable): Zero-argument callable returning the awaitable
+            to (re-)issue.
+
+    Returns:
+        The awaited result of the request.
+    """
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            return await request()
+        except Exception as error:
+            status = getattr(error, "status_code", None)
+            retryable = status is not None and (status == 429 or status >= 500)
+            if not retryable or attempt == _MAX_RETRIES:
+                raise
+            await asyncio.sleep(_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 0.5))
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_python(code_hash: bytes, code: str) -> ast.Module:
+    """
+    Parse Python code, memoized so duplicated batch inputs parse once.
+
+    Args:
+        code_hash (bytes): Digest of the code, keeping the cache key cheap to
+            compare for the multi-kilobyte sources seen in batch mode.
+        code (str): The source code to parse.
+
+    Returns:
+        ast.Module: The parsed module tree.
+
+    Raises:
+        SyntaxError: If the code is not valid Python.
+    """
+    return ast.parse(code)
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text.
+
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for a pre-flight budget check across the heterogeneous backends this CLI
+    supports; an exact tokenizer would have to be provider-specific.
+
+    Args:
+        text (str): The text to estimate.
+
+    Returns:
+        int: The approximate number of tokens.
+    """
+    return len(text) // 4 + 1
+
+
 class Generator:
     """
     A class to generate unit tests for a given class using various AI models.
@@ -38,6 +206,7 @@ class Generator:
         model (ModelType): The AI model to use for generation.
         settings (Settings): Configuration settings for API keys and other parameters.
         generator (TestGenerator): The specific test generator based on the chosen model.
+        use_cache (bool): Whether to reuse cached responses for repeated prompts.
     """
 
     def __init__(self, console: Console,
@@ -45,7 +214,10 @@ class Generator:
                  context_code: Union[List[str], str, None] = None,
                  instruction: Union[List[str], str, None] = None,
                  sample: Optional[str] = None,
-                 model: ModelType = ModelType.SONNET):
+                 model: ModelType = ModelType.SONNET,
+                 use_cache: bool = True,
+                 semantic_threshold: Optional[float] = None,
+                 cache_ttl: Optional[int] = None):
         """
         Initialize the Generator with the necessary parameters.
 
@@ -56,6 +228,13 @@ class Generator:
             instruction (List[str], optional): Additional instructions for test generation. Defaults to None.
             sample (str, optional): An example of existing unit tests. Defaults to None.
             model (ModelType, optional): The AI model to use. Defaults to ModelType.SONNET.
+            use_cache (bool, optional): Whether to serve repeated prompts from the
+                on-disk response cache. Defaults to True.
+            semantic_threshold (float, optional): Similarity ratio above which
+                near-duplicate prompts reuse a cached response. None keeps
+                exact matching only. Defaults to None.
+            cache_ttl (int, optional): Cached response time-to-live in
+                seconds. None keeps the cache default. Defaults to None.
         """
         self.console = console
         self.class_code = class_code
@@ -63,8 +242,33 @@ class Generator:
         self.instruction = self._process_input(instruction, ", ", "No additional instruction provided.")
         self.sample = sample or "No example provided."
         self.model = model
-        self.settings = Settings()
+        self.settings = get_settings()
+        self.use_cache = use_cache
         self.generator = self.__get_generator()
+        self.generator.cache = self.__create_cache(use_cache, semantic_threshold, cache_ttl)
+
+    @staticmethod
+    def __create_cache(use_cache: bool, semantic_threshold: Optional[float],
+                       cache_ttl: Optional[int]) -> Optional[LLMCache]:
+        """
+        Build the response cache matching the requested caching mode.
+
+        Args:
+            use_cache (bool): Whether caching is enabled at all.
+            semantic_threshold (Optional[float]): Similarity ratio for fuzzy
+                matching, or None for exact matching only.
+            cache_ttl (Optional[int]): Entry time-to-live in seconds, or None
+                for the cache default.
+
+        Returns:
+            Optional[LLMCache]: The cache instance, or None when disabled.
+        """
+        if not use_cache:
+            return None
+        ttl_kwargs = {"ttl": cache_ttl} if cache_ttl is not None else {}
+        if semantic_threshold is not None:
+            return SemanticLLMCache(threshold=semantic_threshold, **ttl_kwargs)
+        return LLMCache(**ttl_kwargs)
 
     @staticmethod
     def _process_input(input_data: Union[List[str], str, None],
@@ -86,12 +290,26 @@ class Generator:
             return input_data
         return default
 
+    # Single-slot, process-wide memo of the last generation: catches
+    # back-to-back regeneration of the same input (watch mode, editor
+    # integrations) even when the on-disk cache is disabled.
+    _last: Optional[Tuple[str, str]] = None
+
+    # Frozen at class-definition time: dispatch stays a single dict lookup
+    # and no caller can mutate the backend table at runtime.
+    _BACKENDS = types.MappingProxyType({
+        ModelType.SONNET: lambda settings: AnthropicTestGenerator(settings.ANTHROPIC_API_KEY),
+        ModelType.GPT4: lambda settings: OpenAITestGenerator(settings.OPENAI_API_KEY,
+                                                             settings.OPENAI_ORG_ID),
+        ModelType.OLLAMA: lambda settings: OllamaTestGenerator(),
+    })
+
     def __get_generator(self) -> TestGenerator:
         """
         Create and return the appropriate TestGenerator based on the selected model.
 
-        This method initializes and returns the specific TestGenerator subclass
-        corresponding to the chosen AI model.
+        Dispatch is a single dict lookup against the class-level backend
+        table, so adding a model is one entry instead of another branch.
 
         Returns:
             TestGenerator: An instance of the appropriate TestGenerator subclass.
@@ -99,14 +317,13 @@ class Generator:
         Raises:
             ValueError: If an unsupported model type is specified.
         """
-        self.console.print(f"[cyan]Initializing {self.model.value} generator...")
-        if self.model == ModelType.SONNET:
-            return AnthropicTestGenerator(self.settings.ANTHROPIC_API_KEY)
-        elif self.model == ModelType.GPT4:
-            return OpenAITestGenerator(self.settings.OPENAI_API_KEY, self.settings.OPENAI_ORG_ID)
-        elif self.model == ModelType.OLLAMA or self.model == ModelType.OLLAMA:
-            return OllamaTestGenerator()
-        else:
+        # Styled status lines are TTY-only chatter: piped/CI output should
+        # hold just the generated tests and any warnings.
+        if self.console.is_terminal:
+            self.console.print(f"[cyan]Initializing {self.model.value} generator...")
+        try:
+            return self._BACKENDS[self.model](self.settings)
+        except KeyError:
             raise ValueError(f"Unsupported model: {self.model}")
 
     def __create_prompt(self) -> str:
@@ -120,85 +337,285 @@ class Generator:
         Returns:
             str: A formatted string containing the complete prompt for the AI model.
         """
-        return textwrap.dedent(f"""
-            You are an AI model designed to help write unit tests for a provided class. The user will supply one or two pieces of information:
-            1. A class for which unit tests need to be written.
-            2. (Optional) An example unit tests class that demonstrates the structure and style of the tests.
-            3. (Optional) The contextual code to better understand the class from point 1.
-
-            Your task is to generate unit tests for the provided class. If an example unit tests class is provided, ensure that the tests adhere to the same style, structure, and level of detail as the example. Additionally, use the Given-When-Then format to explain each test case and ensure that edge cases are considered. Follow best practices for writing tests, ensuring the generated code is clean and easy for developers to read.
-            
-            **Instructions:**
-            
-            1. Detect the programming language of the provided class.
-            2. Analyze the provided class to understand its methods and functionalities.
-            3. (If provided) Review the example unit tests class to understand its structure, naming conventions, and testing approach.
-            4. Write unit tests for the provided class, ensuring each method is adequately tested, including edge cases.
-            5. Use the Given-When-Then format to explain each test:
-               - **Given**: The initial context or state.
-               - **When**: The action or event that triggers the behavior.
-               - **Then**: The expected outcome or result.
-            6. Use appropriate libraries, frameworks, and patterns from the detected programming language to write the tests.
-            7. Follow best practices for writing unit tests, including:
-               - Clear naming conventions
-               - Proper use of setup and teardown methods
-               - Comprehensive assertions
-               - Test isolation (ensure tests don't depend on each other)
-               - Efficient test design to avoid unnecessarily slow tests
-            8. Implement mocking and dependency injection where necessary to isolate the unit under test.
-            9. Use parameterized tests when appropriate to test multiple scenarios with the same test logic.
-            10. Aim for high code coverage (e.g., 80% or higher) and include a comment in the code about the estimated coverage achieved.
-            11. Add code comments to explain complex test setups or assertions.
-            12. Include tests for error scenarios and exception handling.
-            13. Consider how the tests would run in a Continuous Integration (CI) environment and add any necessary setup or configuration as code or configuration files.
-            14. Ensure the tests are clear, readable, and maintain consistency.
-            15. Include necessary imports, setup methods, and assertions. If an example unit tests class is provided, follow its conventions.
-            
-            **Additional instructions:**
-            {self.instruction}
-            
-            **Example:**
-            
-            - **Provided Class:**
-            ```
-            {self.class_code}
-            ```
-            
-            - **(Optional) Contextual code:**
-            ```
-            {self.context_code}
-            ```
-            
-            - **(Optional) Example Unit Tests Class:**
-            ```
-            {self.sample}
-            ```
-            
-            **Output:**
-            
-            Generate a unit tests class for the provided class, and if an example is provided, format it similarly to the example unit tests class. Include Given-When-Then explanations for each test case as code comments, covering both typical scenarios and edge cases. Ensure the code follows best practices, is clean, and easy to read. Use the appropriate libraries and patterns from the detected programming language. 
-            
-            The output should contain ONLY the following, without any additional explanation or comments from the AI:
-            1. The complete code for the unit tests, including imports and any necessary setup.
-            2. A code comment about the estimated code coverage achieved.
-            3. Any necessary setup or configuration for running in a CI environment, as code or configuration files.
-            4. Code comments explaining complex test setups or assertions.
-            
-            Ensure that the generated tests are isolated, efficient, and cover error scenarios. Use mocking and dependency injection where appropriate, and implement parameterized tests for multiple similar scenarios. Do not include any text or explanations outside of the code and code comments.
-            """)
-
-    def generate_tests(self) -> str:
+        static, dynamic = self.__create_prompt_parts()
+        return static + dynamic
+
+    def __create_prompt_parts(self) -> tuple:
+        """
+        Build the prompt as a (static, dynamic) pair.
+
+        The static part holds all generation guidance plus the session-stable
+        inputs (context, example, instructions); the dynamic part appends only
+        the class code. Keeping the split lets backends mark the static part
+        for provider-side prompt caching, so a batch sharing one -c/-e/-i set
+        reuses the cached prefix across every file.
+
+        Returns:
+            tuple: The static prompt prefix and the dynamic class block.
+        """
+        return self.__static_prefix(self.context_code), self.__class_block(self.class_code)
+
+    def __static_prefix(self, context_code: str) -> str:
+        """
+        Format the cacheable prompt prefix for the given contextual code.
+
+        Args:
+            context_code (str): The contextual code to include.
+
+        Returns:
+            str: The guidance plus session inputs forming the prompt prefix.
+        """
+        return _PROMPT_STATIC + _PROMPT_SESSION_TEMPLATE.format_map({
+            "instruction": self.instruction,
+            "context_code": context_code,
+            "sample": self.sample,
+        })
+
+    @staticmethod
+    def __class_block(class_code: str) -> str:
+        """
+        Format the dynamic class block closing the prompt.
+
+        Args:
+            class_code (str): The class code to include.
+
+        Returns:
+            str: The formatted class block.
+        """
+        return _PROMPT_CLASS_TEMPLATE.format_map({"class_code": class_code})
+
+    def __prompt_chunks(self) -> List[Tuple[str, str]]:
+        """
+        Build one or more (static, dynamic) prompt pairs that fit the model window.
+
+        When the full prompt exceeds the model's context window minus the
+        output budget, contextual code is trimmed from the tail first; if the
+        class code alone is still over budget, it is split into per-declaration
+        chunks, each generating tests in a separate call.
+
+        Returns:
+            List[Tuple[str, str]]: Prompt pairs, each within the token budget.
+        """
+        limit = _MODEL_TOKEN_LIMITS[self.model] - _MAX_OUTPUT_TOKENS
+        static = self.__static_prefix(self.context_code)
+        dynamic = self.__class_block(self.class_code)
+        if _estimate_tokens(static) + _estimate_tokens(dynamic) <= limit:
+            return [(static, dynamic)]
+
+        static = self.__static_prefix(self.__trim_context(limit))
+        if _estimate_tokens(static) + _estimate_tokens(dynamic) <= limit:
+            return [(static, dynamic)]
+
+        overhead = _estimate_tokens(static) + _estimate_tokens(self.__class_block(""))
+        chunks = self.__split_class_code(max(limit - overhead, 1))
+        self.console.print(f"[yellow]Input exceeds the {self.model.value} context window; "
+                           f"splitting the class into {len(chunks)} chunks.")
+        return [(static, self.__class_block(chunk)) for chunk in chunks]
+
+    def __trim_context(self, budget: int) -> str:
+        """
+        Trim contextual code from the tail until the prompt fits the budget.
+
+        A binary search over the number of kept context lines finds the
+        largest prefix that still fits.
+
+        Args:
+            budget (int): Token budget available for the whole prompt.
+
+        Returns:
+            str: The (possibly trimmed) contextual code.
+        """
+        lines = self.context_code.splitlines()
+        class_tokens = _estimate_tokens(self.__class_block(self.class_code))
+
+        def fits(kept: int) -> bool:
+            context = "\n".join(lines[:kept]) or "No contextual code provided."
+            return _estimate_tokens(self.__static_prefix(context)) + class_tokens <= budget
+
+        low, high = 0, len(lines)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if fits(mid):
+                low = mid
+            else:
+                high = mid - 1
+        if low < len(lines):
+            self.console.print(f"[yellow]Trimmed contextual code to {low} of {len(lines)} lines "
+                               f"to fit the {self.model.value} context window.")
+        return "\n".join(lines[:low]) or "No contextual code provided."
+
+    def __split_class_code(self, budget: int) -> List[str]:
+        """
+        Split the class code into chunks that fit the given token budget.
+
+        Python sources are split on top-level declarations via ast so each
+        chunk stays syntactically meaningful; other languages fall back to
+        plain character chunking.
+
+        Args:
+            budget (int): Token budget available for each code chunk.
+
+        Returns:
+            List[str]: The code chunks, in source order.
+        """
+        segments = None
+        try:
+            tree = _parse_python(hashlib.sha1(self.class_code.encode()).digest(), self.class_code)
+            code_lines = self.class_code.splitlines()
+            segments = ["\n".join(code_lines[node.lineno - 1:node.end_lineno])
+                        for node in tree.body]
+        except SyntaxError:
+            pass
+        if not segments:
+            step = max(budget * 4, 1)
+            return [self.class_code[i:i + step] for i in range(0, len(self.class_code), step)] or [""]
+
+        chunks, current, current_tokens = [], [], 0
+        for segment in segments:
+            segment_tokens = _estimate_tokens(segment)
+            if current and current_tokens + segment_tokens > budget:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(segment)
+            current_tokens += segment_tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    def __memo_key(self) -> str:
+        """
+        Compute the in-process memo key for this generation's inputs.
+
+        Returns:
+            str: A hex sha256 digest over the model and all prompt inputs.
+        """
+        payload = "\x00".join((self.model.value, self.class_code, self.context_code,
+                               self.sample, self.instruction))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def __check_memo(self, key: str, on_chunk: Optional[Callable[[str], None]]) -> Optional[str]:
+        """
+        Return the memoized result when the inputs match the last run.
+
+        Args:
+            key (str): The key returned by __memo_key.
+            on_chunk (Optional[Callable[[str], None]]): Streaming callback to
+                replay the memoized result through, if provided.
+
+        Returns:
+            Optional[str]: The memoized tests, or None when inputs differ.
+        """
+        last = Generator._last
+        if last is None or last[0] != key:
+            return None
+        if on_chunk:
+            on_chunk(last[1])
+        return last[1]
+
+    def generate_tests(self, on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate unit tests using the configured AI model.
 
         This method creates the prompt, sends it to the appropriate AI model,
         and returns the generated unit tests.
 
+        Args:
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta as it arrives. Defaults to None.
+
+        Returns:
+            str: The generated unit tests as a string.
+        """
+        if not self.class_code.strip():
+            # Route the placeholder through on_chunk like the memo and cache
+            # hits do, so a streaming sink still receives the content.
+            placeholder = "// No class code provided."
+            if on_chunk:
+                on_chunk(placeholder)
+            return placeholder
+        key = self.__memo_key()
+        memoized = self.__check_memo(key, on_chunk)
+        if memoized is not None:
+            return memoized
+        prompts = self.__prompt_chunks()
+        if self.console.is_terminal:
+            self.console.print(f"[cyan]Sending request to {self.model.value}...")
+        limiter = self.generator.rate_limiter()
+        results = []
+        for static, dynamic in prompts:
+            if results and on_chunk:
+                on_chunk("\n\n")
+            with limiter:
+                results.append(self.generator.generate(dynamic, system=static, on_chunk=on_chunk))
+        if self.console.is_terminal:
+            self.console.print(f"[green]Received response from {self.model.value}")
+        result = "\n\n".join(results)
+        Generator._last = (key, result)
+        return result
+
+    async def agenerate_tests(self, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate unit tests using the configured AI model asynchronously.
+
+        Awaitable counterpart of generate_tests, allowing several models to
+        run concurrently so the total wall-clock time is bounded by the
+        slowest backend instead of the sum of all of them. When the class is
+        split across several prompt chunks, the chunk requests themselves fan
+        out concurrently as well, with transient provider errors retried
+        under exponential backoff.
+
+        Args:
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta as it arrives. Defaults to None.
+
         Returns:
             str: The generated unit tests as a string.
         """
-        prompt = self.__create_prompt()
-        self.console.print(f"[cyan]Sending request to {self.model.value}...")
-        result = self.generator.generate(prompt)
-        self.console.print(f"[green]Received response from {self.model.value}")
+        if not self.class_code.strip():
+            # Route the placeholder through on_chunk like the memo and cache
+            # hits do, so a streaming sink still receives the content.
+            placeholder = "// No class code provided."
+            if on_chunk:
+                on_chunk(placeholder)
+            return placeholder
+        key = self.__memo_key()
+        memoized = self.__check_memo(key, on_chunk)
+        if memoized is not None:
+            return memoized
+        prompts = self.__prompt_chunks()
+        if self.console.is_terminal:
+            self.console.print(f"[cyan]Sending request to {self.model.value}...")
+        limiter = self.generator.rate_limiter()
+
+        async def call_one(static: str, dynamic: str,
+                           chunk_cb: Optional[Callable[[str], None]]) -> str:
+            # Acquire off the event loop so waiting for a slot never blocks
+            # coroutines that are already streaming in this loop.
+            await asyncio.to_thread(limiter.acquire)
+            try:
+                return await _call_with_retry(
+                    lambda: self.generator.agenerate(dynamic, system=static, on_chunk=chunk_cb))
+            finally:
+                limiter.release()
+
+        if len(prompts) == 1:
+            static, dynamic = prompts[0]
+            result = await call_one(static, dynamic, on_chunk)
+        else:
+            # Chunk requests run concurrently, so deltas from different
+            # chunks would interleave; buffer them and replay through
+            # on_chunk in source order once everything has arrived.
+            semaphore = asyncio.Semaphore(_CHUNK_CONCURRENCY)
+
+            async def gated(static: str, dynamic: str) -> str:
+                async with semaphore:
+                    return await call_one(static, dynamic, None)
+
+            results = await asyncio.gather(*(gated(static, dynamic) for static, dynamic in prompts))
+            result = "\n\n".join(results)
+            if on_chunk:
+                on_chunk(result)
+        if self.console.is_terminal:
+            self.console.print(f"[green]Received response from {self.model.value}")
+        Generator._last = (key, result)
         return result
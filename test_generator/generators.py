@@ -1,13 +1,148 @@
-import importlib
+import asyncio
+import os
+import socket
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import List, Any
-import importlib.util
-import sys
+from typing import TYPE_CHECKING, List, Any, Callable, Optional
 
-import anthropic
-import ollama
-import psutil
-from openai import OpenAI
+from test_generator.cache import LLMCache, cached
+
+# The SDKs below are imported lazily inside the client factories and
+# backend constructors: each one drags in a full HTTP stack, and eager
+# imports made even `--help` pay for all three providers.
+if TYPE_CHECKING:
+    import anthropic
+    import httpx
+    import ollama
+    from openai import AsyncOpenAI
+
+# Clients are scoped per event loop: pooled connections belong to the loop
+# that created them, so a process-wide singleton breaks (and cannot be
+# closed) once that loop is gone — e.g. across the per-call asyncio.run of
+# the sync generate path. Weak keys let abandoned loops drop their clients
+# for the garbage collector to reclaim.
+_CLIENTS_BY_LOOP: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _loop_clients() -> dict:
+    """
+    Return the client registry for the running event loop.
+
+    Returns:
+        dict: The mutable registry of clients created on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _CLIENTS_BY_LOOP.get(loop)
+    if clients is None:
+        clients = {}
+        _CLIENTS_BY_LOOP[loop] = clients
+    return clients
+
+
+def _shared_http_client() -> "httpx.AsyncClient":
+    """
+    Return this event loop's shared connection pool.
+
+    TLS + TCP setup is paid once per host instead of once per client, and
+    HTTP/2 multiplexes concurrent requests over a single connection in
+    batch mode. Must be called from within a running loop.
+
+    Returns:
+        httpx.AsyncClient: The pooled transport for the current loop.
+    """
+    clients = _loop_clients()
+    client = clients.get("http")
+    if client is None:
+        import httpx
+        client = httpx.AsyncClient(http2=True,
+                                   limits=httpx.Limits(max_connections=64,
+                                                       max_keepalive_connections=20))
+        clients["http"] = client
+    return client
+
+
+def _anthropic_client(api_key: str) -> "anthropic.AsyncAnthropic":
+    """
+    Return this event loop's Anthropic client for an API key.
+
+    A Generator is built per file (and per model) in batch mode; reusing
+    the SDK client keeps its auth setup and header construction to one pass
+    and guarantees every request on the loop shares the pooled transport.
+
+    Args:
+        api_key (str): The API key for Anthropic's service.
+
+    Returns:
+        anthropic.AsyncAnthropic: The shared client instance.
+    """
+    clients = _loop_clients()
+    key = ("anthropic", api_key)
+    if key not in clients:
+        import anthropic
+        clients[key] = anthropic.AsyncAnthropic(api_key=api_key,
+                                                http_client=_shared_http_client())
+    return clients[key]
+
+
+def _openai_client(api_key: str, organization: str) -> "AsyncOpenAI":
+    """
+    Return this event loop's OpenAI client for an (API key, organization) pair.
+
+    Args:
+        api_key (str): The API key for OpenAI's service.
+        organization (str): The organization ID for OpenAI.
+
+    Returns:
+        AsyncOpenAI: The shared client instance.
+    """
+    clients = _loop_clients()
+    key = ("openai", api_key, organization)
+    if key not in clients:
+        from openai import AsyncOpenAI
+        clients[key] = AsyncOpenAI(api_key=api_key, organization=organization,
+                                   http_client=_shared_http_client())
+    return clients[key]
+
+
+def _ollama_client() -> "ollama.AsyncClient":
+    """
+    Return this event loop's Ollama client.
+
+    The SDK builds (and owns) its own httpx client per instance, so one
+    per Generator would mean one unclosed pool per input file in batch
+    mode; scoping it per loop matches the other providers.
+
+    Returns:
+        ollama.AsyncClient: The shared client instance.
+    """
+    clients = _loop_clients()
+    if "ollama" not in clients:
+        import ollama
+        clients["ollama"] = ollama.AsyncClient()
+    return clients["ollama"]
+
+
+async def aclose_clients():
+    """
+    Close the clients created on the current event loop.
+
+    Draining the pool from inside the loop that owns its transports lets
+    keep-alive connections terminate cleanly; callers should await this
+    before their loop shuts down (the SDK clients don't own the transport,
+    so closing the pool is sufficient).
+    """
+    clients = _CLIENTS_BY_LOOP.pop(asyncio.get_running_loop(), None)
+    if clients is None:
+        return
+    http_client = clients.get("http")
+    if http_client is not None:
+        await http_client.aclose()
+    ollama_client = clients.get("ollama")
+    if ollama_client is not None:
+        # The ollama SDK wraps its own httpx client and exposes no close
+        # method of its own, so drain the underlying pool directly.
+        await ollama_client._client.aclose()
 
 
 class CodeNotFoundException(Exception):
@@ -26,23 +161,114 @@ class TestGenerator(ABC):
 
     This class defines the interface for all test generators. Concrete implementations
     should inherit from this class and implement the generate method.
+
+    Attributes:
+        model_name (str): Identifier of the underlying model, used as part
+            of the response cache key.
+        cache (Optional[LLMCache]): Response cache shared by all backends.
+            When None, every call goes to the API.
+        max_concurrent_requests (int): Provider-wide cap on in-flight
+            requests, enforced across all threads in batch mode.
     """
 
+    model_name: str = ""
+    cache: Optional[LLMCache] = None
+    max_concurrent_requests: int = 5
+    _rate_limiters: dict = {}
+    _rate_limiters_lock = threading.Lock()
+
+    @classmethod
+    def rate_limiter(cls) -> threading.BoundedSemaphore:
+        """
+        Return the provider-wide semaphore capping concurrent requests.
+
+        One semaphore exists per concrete generator class, shared across all
+        instances and threads, so batch runs stay within each provider's
+        rate limits regardless of how many files are processed in parallel.
+
+        Returns:
+            threading.BoundedSemaphore: The shared per-provider semaphore.
+        """
+        with cls._rate_limiters_lock:
+            if cls not in cls._rate_limiters:
+                cls._rate_limiters[cls] = threading.BoundedSemaphore(cls.max_concurrent_requests)
+            return cls._rate_limiters[cls]
+
     @abstractmethod
-    def generate(self, prompt: str) -> str:
+    async def agenerate(self, prompt: str, system: Optional[str] = None,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
-        Generate tests based on the given prompt.
+        Generate tests based on the given prompt asynchronously.
 
-        This abstract method should be implemented by all concrete test generator classes.
+        This abstract method should be implemented by all concrete test generator
+        classes. Implementations must not block the event loop, so that multiple
+        backends can run concurrently, and should stream the response, invoking
+        on_chunk for every received text delta.
 
         Args:
             prompt (str): The prompt to generate tests from.
+            system (str, optional): Static instruction prefix, identical across
+                invocations, that backends may mark for provider-side prompt
+                caching. Defaults to None.
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta as it arrives. Defaults to None.
 
         Returns:
             str: The generated tests as a string.
         """
         pass
 
+    def generate(self, prompt: str, system: Optional[str] = None,
+                 on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate tests based on the given prompt.
+
+        Synchronous convenience wrapper around agenerate for callers that
+        are not running inside an event loop.
+
+        Args:
+            prompt (str): The prompt to generate tests from.
+            system (str, optional): Static instruction prefix. Defaults to None.
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta. Defaults to None.
+
+        Returns:
+            str: The generated tests as a string.
+        """
+        async def run() -> str:
+            # The private loop dies with this call, so close its clients
+            # before it does; pooled connections cannot outlive their loop.
+            try:
+                return await self.agenerate(prompt, system=system, on_chunk=on_chunk)
+            finally:
+                await aclose_clients()
+
+        return asyncio.run(run())
+
+    async def agenerate_batch(self, prompts: List[str], max_concurrency: int = 5) -> List[str]:
+        """
+        Generate tests for several prompts concurrently.
+
+        All prompts are submitted at once and gated by a semaphore so the
+        number of in-flight requests stays within the provider's rate limits,
+        while tokens-per-minute utilization stays close to the ceiling.
+
+        Args:
+            prompts (List[str]): The prompts to generate tests from.
+            max_concurrency (int, optional): Maximum number of concurrent
+                requests. Defaults to 5.
+
+        Returns:
+            List[str]: The generated tests, one entry per prompt in order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate_one(prompt: str) -> str:
+            async with semaphore:
+                return await self.agenerate(prompt)
+
+        return list(await asyncio.gather(*(generate_one(prompt) for prompt in prompts)))
+
 
 class AnthropicTestGenerator(TestGenerator):
     """
@@ -52,6 +278,8 @@ class AnthropicTestGenerator(TestGenerator):
     It uses the Anthropic API to generate unit tests based on the given prompt.
     """
 
+    model_name = "claude-3-sonnet-20240229"
+
     def __init__(self, api_key: str):
         """
         Initialize the Anthropic test generator.
@@ -59,17 +287,37 @@ class AnthropicTestGenerator(TestGenerator):
         Args:
             api_key (str): The API key for Anthropic's service.
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.api_key = api_key
+
+    @property
+    def client(self) -> "anthropic.AsyncAnthropic":
+        """
+        The Anthropic client for the current event loop.
+
+        Resolved per request rather than at construction time, since the
+        Generator may be built before (or outside) the loop that will
+        issue the calls.
+        """
+        return _anthropic_client(self.api_key)
 
-    def generate(self, prompt: str) -> str:
+    @cached
+    async def agenerate(self, prompt: str, system: Optional[str] = None,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate tests using Anthropic's API.
 
-        This method sends the prompt to Anthropic's API and processes the response
-        to extract the generated code.
+        This method streams the response from Anthropic's API, reporting each
+        text delta through on_chunk so callers see output as it is generated
+        instead of waiting for the full completion. The static system prefix
+        is marked with cache_control so Anthropic caches it across
+        invocations, cutting input token cost and time-to-first-token on
+        repeat runs.
 
         Args:
             prompt (str): The prompt to generate tests from.
+            system (str, optional): Static instruction prefix. Defaults to None.
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta. Defaults to None.
 
         Returns:
             str: The generated tests as a string.
@@ -77,39 +325,70 @@ class AnthropicTestGenerator(TestGenerator):
         Raises:
             CodeNotFoundException: If no code is found in the API response.
         """
-        message = self.client.messages.create(
+        kwargs = {}
+        if system is not None:
+            kwargs["system"] = [
+                {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+            ]
+            # The pinned SDK predates prompt caching going GA, so the beta
+            # header is required for cache_control to take effect.
+            kwargs["extra_headers"] = {"anthropic-beta": "prompt-caching-2024-07-31"}
+        if on_chunk is None:
+            message = await self.client.messages.create(
+                max_tokens=4096,
+                temperature=0,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    }
+                ],
+                model=self.model_name,
+                **kwargs,
+            )
+            return self.__extract_code_from_message(message.content)
+
+        buf = []
+        async with self.client.messages.stream(
             max_tokens=4096,
+            temperature=0,
             messages=[
                 {
                     "role": "user",
                     "content": prompt,
                 }
             ],
-            model="claude-3-sonnet-20240229",
-        )
-        return self.__extract_code_from_message(message.content)
+            model=self.model_name,
+            **kwargs,
+        ) as stream:
+            async for text in stream.text_stream:
+                buf.append(text)
+                on_chunk(text)
+        if not buf:
+            raise CodeNotFoundException("No code found in the API response.")
+        return "".join(buf).strip()
 
     @staticmethod
     def __extract_code_from_message(content: List[Any]) -> str:
         """
-         Extract code from the API response.
+        Extract code from the API response.
 
-         This method parses the content returned by Anthropic's API and extracts
-         the code block.
+        This method parses the content returned by Anthropic's API and extracts
+        the first text block.
 
-         Args:
-             content (List[Any]): The content of the API response.
+        Args:
+            content (List[Any]): The content of the API response.
 
-         Returns:
-             str: The extracted code.
+        Returns:
+            str: The extracted code.
 
-         Raises:
-             CodeNotFoundException: If no code is found in the content.
-         """
-        for block in content:
-            if block.type == "text":
-                return block.text.strip()
-        raise CodeNotFoundException("No code found in the API response.")
+        Raises:
+            CodeNotFoundException: If no code is found in the content.
+        """
+        text = next((block.text for block in content if block.type == "text"), None)
+        if text is None:
+            raise CodeNotFoundException("No code found in the API response.")
+        return text.strip()
 
 
 class OpenAITestGenerator(TestGenerator):
@@ -120,6 +399,8 @@ class OpenAITestGenerator(TestGenerator):
     It uses the OpenAI API to generate unit tests based on the given prompt.
     """
 
+    model_name = "gpt-4o"
+
     def __init__(self, api_key: str, organization: str):
         """
         Initialize the OpenAI test generator.
@@ -128,30 +409,67 @@ class OpenAITestGenerator(TestGenerator):
             api_key (str): The API key for OpenAI's service.
             organization (str): The organization ID for OpenAI.
         """
-        self.client = OpenAI(api_key=api_key, organization=organization)
+        self.api_key = api_key
+        self.organization = organization
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        """
+        The OpenAI client for the current event loop.
 
-    def generate(self, prompt: str) -> str:
+        Resolved per request rather than at construction time, since the
+        Generator may be built before (or outside) the loop that will
+        issue the calls.
+        """
+        return _openai_client(self.api_key, self.organization)
+
+    @cached
+    async def agenerate(self, prompt: str, system: Optional[str] = None,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate tests using OpenAI's API.
 
-        This method sends the prompt to OpenAI's API and processes the response
-        to extract the generated code.
+        This method streams the response from OpenAI's API, reporting each
+        text delta through on_chunk so callers see output as it is generated.
+        The static prefix goes first in the message list so OpenAI's automatic
+        prefix caching applies to it.
 
         Args:
             prompt (str): The prompt to generate tests from.
+            system (str, optional): Static instruction prefix. Defaults to None.
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta. Defaults to None.
 
         Returns:
             str: The generated tests as a string.
         """
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that generates unit tests."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=4096
+        messages = [
+            {"role": "system", "content": system or "You are a helpful assistant that generates unit tests."},
+            {"role": "user", "content": prompt}
+        ]
+        if on_chunk is None:
+            response = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                max_tokens=4096,
+                temperature=0
+            )
+            return response.choices[0].message.content
+
+        buf = []
+        response = await self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            max_tokens=4096,
+            temperature=0,
+            stream=True
         )
-        return response.choices[0].message.content
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content or "" if chunk.choices else ""
+            if delta:
+                buf.append(delta)
+                on_chunk(delta)
+        return "".join(buf)
 
 
 class OllamaTestGenerator(TestGenerator):
@@ -162,6 +480,11 @@ class OllamaTestGenerator(TestGenerator):
     It uses Ollama(Codestral) to generate unit tests based on the given prompt.
     """
 
+    # Liveness is probed lazily on the first request and remembered
+    # process-wide: batch runs build one Generator per input file, and the
+    # server doesn't come and go between them.
+    _alive_checked = False
+
     def __init__(self, model: str = 'codestral'):
         """
         Initialize the Ollama test generator.
@@ -170,57 +493,76 @@ class OllamaTestGenerator(TestGenerator):
             model (str, optional): The model to use. Defaults to 'codestral'.
         """
         self.model = model
+        self.model_name = model
 
-    @staticmethod
-    def __is_ollama_running() -> bool:
+    @property
+    def client(self) -> "ollama.AsyncClient":
         """
-         Check if Ollama is running.
-
-         This method checks the system's running processes to determine if
-         Ollama is currently active.
+        The Ollama client for the current event loop.
 
-         Returns:
-             bool: True if Ollama is running, False otherwise.
-         """
-        for process in psutil.process_iter(['name']):
-            if process.name() == 'ollama':
-                return True
-        return False
+        Resolved per request rather than at construction time, since the
+        Generator may be built before (or outside) the loop that will
+        issue the calls.
+        """
+        return _ollama_client()
 
     @staticmethod
-    def __check_ollama_installed() -> bool:
+    def __is_ollama_running() -> bool:
         """
-        Check if Ollama is installed.
+        Check if Ollama is running.
 
-        This method checks if the Ollama package is installed in the current
-        Python environment.
+        A single TCP connect to the Ollama server port replaces scanning the
+        host's process table, which cost one /proc read per running process
+        on every call.
 
         Returns:
-            bool: True if Ollama is installed, False otherwise.
+            bool: True if Ollama is running, False otherwise.
         """
-        return importlib.util.find_spec("ollama") is not None
-
-    def generate(self, prompt: str) -> str:
+        port = int(os.getenv("OLLAMA_PORT", "11434"))
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return True
+        except OSError:
+            return False
+
+    @cached
+    async def agenerate(self, prompt: str, system: Optional[str] = None,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate tests using Ollama.
 
-        This method checks if Ollama is installed and running, then uses it to
-        generate unit tests based on the given prompt.
+        This method verifies once that Ollama is running, then uses it to
+        generate unit tests based on the given prompt, streaming each response
+        fragment through on_chunk when a callback is provided.
 
         Args:
             prompt (str): The prompt to generate tests from.
+            system (str, optional): Static instruction prefix. Defaults to None.
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta. Defaults to None.
 
         Returns:
             str: The generated tests as a string.
 
         Raises:
-            RuntimeError: If Ollama is not running or not installed.
+            RuntimeError: If Ollama is not running.
         """
-        if not self.__is_ollama_running():
-            raise RuntimeError("Ollama is not running. Please start Ollama.")
-
-        if not self.__check_ollama_installed():
-            raise RuntimeError("Ollama is not installed. Please install it using: pip install ollama.")
-
-        response = ollama.generate(self.model, prompt)
-        return response['response']
+        if not OllamaTestGenerator._alive_checked:
+            if not self.__is_ollama_running():
+                raise RuntimeError("Ollama is not running. Please start Ollama.")
+            OllamaTestGenerator._alive_checked = True
+
+        if on_chunk is None:
+            response = await self.client.generate(self.model, prompt, system=system or '',
+                                                  options={"temperature": 0})
+            return response['response']
+
+        buf = []
+        stream = await self.client.generate(self.model, prompt, system=system or '',
+                                            options={"temperature": 0}, stream=True)
+        async for part in stream:
+            delta = part.get('response', '')
+            if delta:
+                buf.append(delta)
+                on_chunk(delta)
+        return "".join(buf)
@@ -6,72 +6,264 @@ using various Language Learning Models (LLMs). It processes input files,
 applies the specified LLM model, and outputs the generated tests.
 
 Usage:
-    python main.py <input_path> [options]
+    python main.py <input_path>... [options]
 
 Options:
     -o, --output     Path to the output file (optional)
-    -m, --model      LLM model to use (default: sonnet3.5)
+    -m, --model      LLM model(s) to use (default: sonnet3.5)
     -e, --example    Path to the example test file (optional)
     -c, --context    List of paths to context files
     -i, --instruction Additional instructions for test generation
+    --no-cache       Disable the on-disk response cache
+    --cache-ttl      Cached response time-to-live in seconds
+    --semantic-cache Enable fuzzy cache matching at the default threshold
+    --semantic-cache-threshold  Similarity ratio for fuzzy cache matching
 """
 
 import argparse
+import asyncio
+import glob
+import hashlib
+import shutil
 import sys
 from pathlib import Path
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+from typing import List, Optional
 
-from test_generator.generator import ModelType
-from test_generator.test_processor import TestProcessor
+# Rich, the processor and the generator stack are imported inside main()
+# after argument parsing: --help and argument-error paths then exit without
+# paying for the provider SDKs, pyperclip or Rich's renderer.
 
-console = Console()
+# Kept in sync with ModelType; listed literally so building the argument
+# parser does not import the generator stack.
+_MODEL_CHOICES = ("sonnet3.5", "gpt4o", "ollama")
+
+
+def _expand_input_paths(patterns: List[str]) -> List[Path]:
+    """
+    Expand literal paths, directories and glob patterns into input files.
+
+    Args:
+        patterns (List[str]): Paths, directories or glob patterns from the
+            command line.
+
+    Returns:
+        List[Path]: Unique matching file paths in a stable order. A
+        directory contributes every file beneath it; patterns with no
+        matches are kept as literal paths so the existence check can
+        report them.
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if matches:
+            for match in map(Path, matches):
+                if match.is_dir():
+                    paths.extend(sorted(path for path in match.rglob("*") if path.is_file()))
+                elif match.is_file():
+                    paths.append(match)
+        else:
+            paths.append(Path(pattern))
+    return list(dict.fromkeys(paths))
+
+
+def _output_path_for(output_path: Optional[Path], input_path: Path, multiple: bool) -> Optional[Path]:
+    """
+    Resolve the output path for one input file.
+
+    Args:
+        output_path (Optional[Path]): The -o argument, if provided. With
+            multiple inputs it is treated as a directory.
+        input_path (Path): The input file being processed.
+        multiple (bool): Whether more than one input file was given.
+
+    Returns:
+        Optional[Path]: The per-file output path, or None for clipboard mode.
+    """
+    if output_path is None:
+        return None
+    if not multiple:
+        return output_path
+    return output_path / f"test_{input_path.name}"
+
+
+def _group_duplicates(input_paths: List[Path], models) -> List[List[Path]]:
+    """
+    Group input files whose content is byte-identical.
+
+    Repo-wide batches often contain duplicated boilerplate (generated stubs,
+    copied __init__ files); generating tests once per unique content and
+    copying the output to the remaining destinations avoids paying an LLM
+    call for each duplicate.
+
+    Args:
+        input_paths (List[Path]): The expanded input files.
+        models: The selected models; part of the grouping key since different
+            models produce different output.
+
+    Returns:
+        List[List[Path]]: Groups of paths sharing identical content, each
+        headed by its representative.
+    """
+    model_key = ",".join(m.value for m in models).encode()
+    groups = {}
+    for path in input_paths:
+        try:
+            digest = hashlib.sha256(path.read_bytes() + model_key).hexdigest()
+        except OSError:
+            digest = str(path)
+        groups.setdefault(digest, []).append(path)
+    return list(groups.values())
+
+
+def _copy_outputs(output_path: Optional[Path], group: List[Path], models, multiple: bool):
+    """
+    Copy a group representative's generated output to its duplicates.
+
+    Args:
+        output_path (Optional[Path]): The -o argument, if provided.
+        group (List[Path]): Input paths sharing identical content; the first
+            entry is the one that was actually processed.
+        models: The selected models, used to resolve per-model file names.
+        multiple (bool): Whether more than one input file was given.
+    """
+    primary = _output_path_for(output_path, group[0], multiple)
+    if primary is None:
+        return
+    for duplicate in group[1:]:
+        target = _output_path_for(output_path, duplicate, multiple)
+        if len(models) == 1:
+            pairs = [(primary, target)]
+        else:
+            pairs = [(primary.with_stem(f"{primary.stem}.{m.value}"),
+                      target.with_stem(f"{target.stem}.{m.value}")) for m in models]
+        for source, destination in pairs:
+            if source.exists():
+                shutil.copy(source, destination)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Process a file using specified LLM model")
-    parser.add_argument("input_path", help="Path to the input file")
+    parser.add_argument("input_path", nargs='+',
+                        help="Path(s) or glob pattern(s) to the input file(s)")
     parser.add_argument("-o", "--output", help="Path to the output file (optional)")
-    parser.add_argument("-m", "--model", type=ModelType, choices=list(ModelType),
-                        default=ModelType.SONNET, help="LLM model to use (default: sonnet3.5)")
+    parser.add_argument("-m", "--model", choices=_MODEL_CHOICES, nargs='+',
+                        default=[_MODEL_CHOICES[0]],
+                        help="LLM model(s) to use; several models run concurrently for "
+                             "comparison (default: sonnet3.5)")
     parser.add_argument("-e", "--example", help="Path to the example test file (optional)")
     parser.add_argument("-c", "--context", nargs='+', help="List of paths to context files e.g. -c file1.py file2.py")
     parser.add_argument("-i", "--instruction", nargs='+', help="Additional instructions e.g. -i 'Use mocktail lib'")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the on-disk response cache and always call the API")
+    parser.add_argument("--cache-ttl", type=int, default=None,
+                        help="Cached response time-to-live in seconds (default: one week)")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Serve near-duplicate prompts from the cache at the default "
+                             "similarity threshold (0.92)")
+    parser.add_argument("--semantic-cache-threshold", type=float, default=None,
+                        help="Similarity ratio (0-1) above which near-duplicate prompts reuse a "
+                             "cached response (default: exact matching only)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Number of input files processed in parallel (default: 4)")
 
     args = parser.parse_args()
 
-    input_path = Path(args.input_path)
-    model = args.model
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
+    from test_generator.cache import SemanticLLMCache
+    from test_generator.generator import ModelType
+    from test_generator.generators import aclose_clients
+    from test_generator.test_processor import TestProcessor
+
+    # Everything this CLI prints carries explicit markup, so the automatic
+    # regex highlighter would only burn CPU re-scanning each string.
+    console = Console(highlight=False)
+    input_paths = _expand_input_paths(args.input_path)
+    models = [ModelType(value) for value in args.model]
     output_path = Path(args.output) if args.output else None
     example_path = Path(args.example) if args.example else None
     context_paths = [Path(path) for path in args.context] if args.context else []
     instruction = args.instruction if args.instruction else None
+    multiple = len(input_paths) > 1
+    semantic_threshold = args.semantic_cache_threshold
+    if semantic_threshold is None and args.semantic_cache:
+        semantic_threshold = SemanticLLMCache.DEFAULT_THRESHOLD
 
-    if not input_path.exists():
-        console.print(Panel(f"[bold red]Error:[/bold red] Input file '{input_path}' does not exist.",
+    if not input_paths:
+        console.print(Panel("[bold red]Error:[/bold red] No input files matched the given paths.",
                             title="File Not Found", expand=False))
         sys.exit(1)
 
-    console.print(Panel(f"Processing file: [bold]{input_path}[/bold]\n"
-                        f"Model: [bold]{args.model.value}[/bold]\n"
-                        f"Output: [bold]{output_path or 'Clipboard'}[/bold]\n"
-                        f"Example: [bold]{example_path or 'Not provided'}[/bold]\n"
-                        f"Context files: [bold]{'\n'.join(str(p) for p in context_paths) or 'Not provided'}[/bold]\n"
-                        f"Instruction: [bold]{instruction or 'Not provided'}[/bold]",
-                        title="File Processing", expand=False))
+    for input_path in input_paths:
+        if not input_path.exists():
+            console.print(Panel(f"[bold red]Error:[/bold red] Input file '{input_path}' does not exist.",
+                                title="File Not Found", expand=False))
+            sys.exit(1)
 
+    if multiple and output_path:
+        output_path.mkdir(parents=True, exist_ok=True)
+
+    # Each label is computed once before formatting; the context join in
+    # particular used to run inside the f-string even with no -c flags.
+    models_label = ", ".join(m.value for m in models)
+    inputs_label = "\n".join(map(str, input_paths))
+    context_label = "\n".join(map(str, context_paths)) if context_paths else "Not provided"
+    console.print(Panel("\n".join([
+        f"Processing file: [bold]{inputs_label}[/bold]",
+        f"Model: [bold]{models_label}[/bold]",
+        f"Output: [bold]{output_path or 'Clipboard'}[/bold]",
+        f"Example: [bold]{example_path or 'Not provided'}[/bold]",
+        f"Context files: [bold]{context_label}[/bold]",
+        f"Instruction: [bold]{instruction or 'Not provided'}[/bold]",
+    ]), title="File Processing", expand=False))
+
+    # In CI or when piped, the live display is pure overhead: the refresh
+    # thread ticks at 10Hz and briefly holds the GIL against the event loop,
+    # so disable it entirely off-TTY and cap the redraw rate on-TTY.
+    is_tty = sys.stdout.isatty()
     try:
         with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
                 BarColumn(),
                 TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                console=console
+                console=console,
+                disable=not is_tty,
+                refresh_per_second=4
         ) as progress:
-            processor = TestProcessor(console, input_path, example_path, context_paths, instruction, output_path,
-                                      model, progress)
-            processor.process()
+            async def process_group(group: List[Path], semaphore: asyncio.Semaphore):
+                async with semaphore:
+                    input_path = group[0]
+                    processor = TestProcessor(console, input_path, example_path, context_paths, instruction,
+                                              _output_path_for(output_path, input_path, multiple),
+                                              models, progress, use_cache=not args.no_cache,
+                                              semantic_threshold=semantic_threshold,
+                                              cache_ttl=args.cache_ttl)
+                    await processor.process()
+                    _copy_outputs(output_path, group, models, multiple)
+
+            async def process_all(groups: List[List[Path]]):
+                # LLM calls are IO-bound, so one event loop overlaps the
+                # network latency of independent files without thread
+                # overhead; the semaphore bounds how many files are in
+                # flight, and the per-provider semaphores keep the request
+                # rate within API limits.
+                semaphore = asyncio.Semaphore(max(args.concurrency, 1))
+                try:
+                    await asyncio.gather(*(process_group(group, semaphore) for group in groups))
+                finally:
+                    # Drain the API clients while their loop is still alive;
+                    # pooled connections cannot be closed once it is gone.
+                    await aclose_clients()
+
+            groups = _group_duplicates(input_paths, models)
+            duplicates = len(input_paths) - len(groups)
+            if duplicates:
+                console.print(f"[dim]{duplicates}/{len(input_paths)} files served from intra-batch dedup[/dim]")
+
+            asyncio.run(process_all(groups))
 
     except SystemExit:
         console.print("[bold red]An error occurred. Please check the messages above.[/bold red]")
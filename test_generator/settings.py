@@ -1,7 +1,33 @@
+import functools
 import os
+from dataclasses import dataclass
 
 
+@dataclass(frozen=True, slots=True)
 class Settings:
-    ANTHROPIC_API_KEY: str = os.getenv(key="ANTHROPIC_API_KEY", default="")
-    OPENAI_API_KEY: str = os.getenv(key="OPENAI_API_KEY", default="")
-    OPENAI_ORG_ID: str = os.getenv(key="OPENAI_ORG_ID", default="")
+    """
+    Immutable snapshot of the environment-provided configuration.
+
+    The class-attribute pattern read the environment at import time, even
+    for runs (like --help) that never touch an API; the values are now
+    captured lazily through get_settings on first use.
+    """
+
+    ANTHROPIC_API_KEY: str = ""
+    OPENAI_API_KEY: str = ""
+    OPENAI_ORG_ID: str = ""
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings, reading the environment once.
+
+    Returns:
+        Settings: The shared frozen settings instance.
+    """
+    return Settings(
+        ANTHROPIC_API_KEY=os.getenv("ANTHROPIC_API_KEY", ""),
+        OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", ""),
+        OPENAI_ORG_ID=os.getenv("OPENAI_ORG_ID", ""),
+    )
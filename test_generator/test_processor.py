@@ -1,8 +1,12 @@
 # file_processor.py
+import asyncio
+import functools
+import os
+import tempfile
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Optional, List
 
-import pyperclip
+import aiofiles
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress
@@ -10,6 +14,58 @@ from rich.progress import Progress
 from test_generator.generator import ModelType, Generator
 
 
+@functools.lru_cache(maxsize=1)
+def _clipboard_copy() -> Callable[[str], None]:
+    """
+    Return the platform clipboard copy function, probed once per process.
+
+    pyperclip.copy would re-detect the backend (spawning xclip/xsel on
+    Linux) per call, which stacks up in batch mode; the import itself is
+    deferred so file-output runs never load pyperclip at all.
+
+    Returns:
+        Callable[[str], None]: The copy function for the detected backend.
+    """
+    import pyperclip
+    copy, _ = pyperclip.determine_clipboard()
+    return copy
+
+# Above this size many clipboards (X11 in particular) choke; fall back to a
+# temp file instead of stalling on a subprocess.
+_CLIPBOARD_MAX_CHARS = 1_000_000
+
+# Cap on concurrently open context files: enough to hide per-file latency,
+# low enough that a huge -c list never exhausts file descriptors.
+_MAX_CONCURRENT_READS = 16
+
+# In-process content cache keyed by (path, mtime_ns, size): batch runs share
+# one context set across every input file, so each context file is read and
+# decoded once per process instead of once per input.
+_READ_CACHE: dict = {}
+_READ_CACHE_MAX_ENTRIES = 128
+
+# Progress descriptions reused across tasks; identical strings let Rich's
+# markup-render cache hit instead of re-tokenizing per update.
+_DESC_PROCESSING = "[cyan]Processing..."
+_DESC_READING = "[cyan]Reading files..."
+_DESC_OUTPUTTING = "[cyan]Outputting result..."
+_DESC_COMPLETE = "[green]Processing complete!"
+_DESC_ERROR = "[bold red]Error!"
+
+
+async def _nothing(result=None):
+    """
+    Placeholder coroutine for optional reads that were not requested.
+
+    Args:
+        result: The value to resolve to. Defaults to None.
+
+    Returns:
+        The given result, unchanged.
+    """
+    return result
+
+
 class TestProcessor:
     """
     A class to manage the process of generating unit tests using AI models.
@@ -25,8 +81,9 @@ class TestProcessor:
         context_paths (List[Path]): Paths to additional context files.
         instruction (List[str]): Additional instructions for test generation.
         output_path (Optional[Path]): Path to save the generated tests, if provided.
-        model (ModelType): The AI model to use for test generation.
+        models (List[ModelType]): The AI models to use for test generation.
         progress (Progress): Progress bar for tracking the process.
+        use_cache (bool): Whether to reuse cached responses for repeated prompts.
     """
 
     def __init__(self, console: Console,
@@ -35,8 +92,11 @@ class TestProcessor:
                  context_paths: List[Path],
                  instruction: List[str],
                  output_path: Optional[Path],
-                 model: ModelType,
-                 progress: Progress):
+                 models: List[ModelType],
+                 progress: Progress,
+                 use_cache: bool = True,
+                 semantic_threshold: Optional[float] = None,
+                 cache_ttl: Optional[int] = None):
         """
         Initialize the TestProcessor with the necessary parameters.
 
@@ -47,54 +107,138 @@ class TestProcessor:
             context_paths (List[Path]): Paths to additional context files.
             instruction (List[str]): Additional instructions for test generation.
             output_path (Optional[Path]): Path to save the generated tests, if provided.
-            model (ModelType): The AI model to use for test generation.
+            models (List[ModelType]): The AI models to use for test generation.
+                With several models, all requests run concurrently.
             progress (Progress): Progress bar for tracking the process.
+            use_cache (bool, optional): Whether to reuse cached responses for
+                repeated prompts. Defaults to True.
+            semantic_threshold (float, optional): Similarity ratio above which
+                near-duplicate prompts reuse a cached response. Defaults to None.
+            cache_ttl (int, optional): Cached response time-to-live in seconds.
+                Defaults to None, keeping the cache's one-week default.
         """
         self.console = console
         self.input_path = input_path
         self.example_path = example_path
         self.output_path = output_path
-        self.model = model
+        self.models = models
         self.progress = progress
-        self.context_paths = context_paths
+        # A path listed twice would be read (and sent to the model) twice.
+        self.context_paths = list(dict.fromkeys(context_paths))
         self.instruction = instruction
+        self.use_cache = use_cache
+        self.semantic_threshold = semantic_threshold
+        self.cache_ttl = cache_ttl
 
-    def process(self):
+    async def process(self):
         """
         Execute the main test generation process.
 
         This method orchestrates the entire test generation workflow, including
         reading input files, generating tests, and outputting results. It also
-        manages the progress bar updates and error handling.
+        manages the progress bar updates and error handling. The input,
+        example, and context files are all read concurrently, so the read
+        phase costs one round of filesystem latency instead of one per file.
 
         Raises:
             Exception: If an error occurs during the test generation process.
         """
-        task = self.progress.add_task("[cyan]Processing...", total=100)
-        self.progress.update(task, description="[cyan]Reading input file...", advance=10)
-        content = self.__read_file(self.input_path)
+        # When the display is disabled (non-TTY runs) every update is a no-op,
+        # so skip them entirely and avoid formatting description strings that
+        # will never be rendered.
+        verbose = not self.progress.disable
+        task = self.progress.add_task(_DESC_PROCESSING, total=100)
+        if verbose:
+            self.progress.update(task, description=_DESC_READING)
+        content, example, context_contents = await asyncio.gather(
+            self.__read_file(self.input_path),
+            self.__read_file(self.example_path) if self.example_path else _nothing(""),
+            self.__read_context_files() if self.context_paths else _nothing(),
+        )
 
-        self.progress.update(task, description="[cyan]Reading example file (if provided)...", advance=10)
-        example = self.__read_file(self.example_path) if self.example_path else ""
+        # One update for the whole read phase: the files are read in a single
+        # gather, so intermediate per-phase descriptions would each force a
+        # re-render only to be replaced within the same refresh tick.
+        if verbose:
+            models_label = ", ".join(m.value for m in self.models)
+            self.progress.update(task, description=f"[cyan]Generating tests using {models_label}...", advance=40)
+        # Streaming budget: the generation phase owns 50 of the task's 100
+        # units; each text delta advances the bar a little, and whatever is
+        # left of the budget is consumed when the stream completes.
+        streamed = {"advanced": 0.0, "unflushed": 0}
+        # With a single model and an output file, each delta goes straight to
+        # disk so the full response is never buffered in memory; clipboard
+        # mode (and multi-model comparison) still accumulates the text.
+        sink = self.__open_sink()
 
-        self.progress.update(task, description="[cyan]Reading context files...", advance=10)
-        context_contents = self.__read_context_files() if self.context_paths else None
+        def on_chunk(chunk: str):
+            if sink:
+                sink.write(chunk)
+                # Flush about once per KB: the file on disk trails the
+                # stream closely (a partial artifact survives a killed run)
+                # without paying a syscall per token-sized delta.
+                streamed["unflushed"] += len(chunk)
+                if streamed["unflushed"] >= 1024:
+                    sink.flush()
+                    streamed["unflushed"] = 0
+            if not verbose:
+                return
+            step = min(len(chunk) / 200.0, 50.0 - streamed["advanced"])
+            if step > 0:
+                streamed["advanced"] += step
+                self.progress.advance(task, step)
 
-        self.progress.update(task, description=f"[cyan]Generating tests using {self.model.value}...", advance=10)
         try:
-            processed_content = self.__process_with_llm(content, example, context_contents, self.instruction)
-            self.progress.update(task, description="[cyan]Outputting result...", advance=50)
-            self.__output_result(processed_content)
-            self.progress.update(task, description="[green]Processing complete!", advance=10)
+            results = await self.__process_with_llm(content, example, context_contents, self.instruction,
+                                                    on_chunk)
+            if verbose:
+                self.progress.update(task, description=_DESC_OUTPUTTING,
+                                     advance=max(0.0, 50.0 - streamed["advanced"]))
+            if sink:
+                sink.close()
+                self.console.print(Panel(f"Result written to [bold green]{self.output_path}[/bold green]",
+                                         title="Success", expand=False))
+            elif len(self.models) == 1:
+                self.__output_result(results[0])
+            else:
+                for model, result in zip(self.models, results):
+                    self.__output_model_result(model, result)
+            if verbose:
+                self.progress.update(task, description=_DESC_COMPLETE, advance=10)
 
         except Exception as e:
-            self.progress.update(task, description="[bold red]Error!", advance=60)
+            if sink:
+                sink.close()
+            if verbose:
+                self.progress.update(task, description=_DESC_ERROR, advance=60)
             self.console.print(
                 Panel(f"[bold red]Error generating tests:[/bold red] {str(e)}", title="Processing Error", expand=False))
 
-    def __read_file(self, file_path: Path) -> str:
+    def __open_sink(self):
+        """
+        Open the output file for incremental writes, when applicable.
+
+        Streaming to disk only works for a single model writing to a known
+        output path; any write error falls back to buffered output.
+
+        Returns:
+            Optional[TextIO]: The open file object, or None to buffer in memory.
+        """
+        if not self.output_path or len(self.models) != 1:
+            return None
+        try:
+            # UTF-8 explicitly, matching the buffered path: the platform
+            # default (e.g. cp1252) can raise mid-stream on generated output.
+            return open(self.output_path, 'w', encoding='utf-8')
+        except IOError as e:
+            self.console.print(
+                Panel(f"[bold red]Error:[/bold red] Unable to write to file: {self.output_path}\n{str(e)}",
+                      title="File Write Error", expand=False))
+            return None
+
+    async def __read_file(self, file_path: Path) -> str:
         """
-        Read the contents of a file.
+        Read the contents of a file without blocking the event loop.
 
         Args:
             file_path (Path): The path to the file to be read.
@@ -106,49 +250,131 @@ class TestProcessor:
             FileNotFoundError: If the specified file is not found.
             IOError: If there's an error reading the file.
         """
-        try:
-            with open(file_path, 'r') as file:
-                return file.read()
-        except FileNotFoundError:
+        # A plain pre-check: the missing-file case is an expected user error
+        # (optional example paths, typos), not worth an exception round-trip.
+        if not os.path.isfile(file_path):
             self.console.print(Panel(f"[bold yellow]Warning:[/bold yellow] File not found: {file_path}",
                                      title="File Not Found", expand=False))
             return ""
+        try:
+            stat = os.stat(file_path)
+            key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+            cached = _READ_CACHE.get(key)
+            if cached is not None:
+                return cached
+            # Binary read + one decode: a single bulk read into memory, then
+            # one UTF-8 pass, instead of TextIOWrapper's chunked decode loop.
+            async with aiofiles.open(file_path, 'rb') as file:
+                content = (await file.read()).decode('utf-8', errors='replace')
+            if len(_READ_CACHE) >= _READ_CACHE_MAX_ENTRIES:
+                _READ_CACHE.clear()
+            _READ_CACHE[key] = content
+            return content
         except IOError as e:
             self.console.print(Panel(f"[bold red]Error:[/bold red] Unable to read file: {file_path}\n{str(e)}",
                                      title="File Read Error", expand=False))
             return ""
 
-    def __read_context_files(self) -> List[str]:
+    async def __read_context_files(self) -> List[str]:
         """
-        Read the contents of all context files.
+        Read the contents of all context files concurrently.
+
+        The reads are gated by a semaphore so a large -c list overlaps its
+        I/O without holding every file open at once.
 
         Returns:
             List[str]: A list containing the contents of all context files.
         """
-        context_contents = []
-        for path in self.context_paths:
-            content = self.__read_file(path)
-            if content:
-                context_contents.append(content)
-        return context_contents
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_READS)
+
+        async def read_one(path: Path) -> str:
+            async with semaphore:
+                return await self.__read_file(path)
 
-    def __process_with_llm(self, content: str, example: str, context_contents: List[str],
-                           instruction: List[str]) -> str:
+        # Issue the reads grouped by parent directory: peer files passed with
+        # -c usually live together, and back-to-back reads in one directory
+        # get dentry/page-cache locality. The returned contents keep the
+        # original CLI order, which the prompt (and its cache key) depend on.
+        ordered = sorted(self.context_paths, key=lambda path: (str(path.parent), str(path)))
+        contents = dict(zip(ordered, await asyncio.gather(*(read_one(path) for path in ordered))))
+        return [contents[path] for path in self.context_paths if contents[path]]
+
+    async def __process_with_llm(self, content: str, example: str, context_contents: List[str],
+                                 instruction: List[str],
+                                 on_chunk: Optional[Callable[[str], None]] = None) -> List[str]:
         """
-        Process the input content using the specified LLM model to generate tests.
+        Process the input content using the configured LLM models to generate tests.
+
+        One generation coroutine is started per model and all of them run
+        concurrently, so the wall-clock time is bounded by the slowest model
+        rather than the sum of all calls.
 
         Args:
             content (str): The main content to generate tests for.
             example (str): An example of existing tests, if provided.
             context_contents (List[str]): Additional context for test generation.
             instruction (List[str]): Additional instructions for test generation.
+            on_chunk (Callable[[str], None], optional): Callback invoked with
+                each streamed text delta. Defaults to None.
 
         Returns:
-            str: The generated tests as a string.
+            List[str]: The generated tests, one entry per model in order.
         """
-        test_generator = Generator(self.console, class_code=content, context_code=context_contents,
-                                   instruction=instruction, sample=example, model=self.model)
-        return test_generator.generate_tests()
+        generators = [Generator(self.console, class_code=content, context_code=context_contents,
+                                instruction=instruction, sample=example, model=model,
+                                use_cache=self.use_cache, semantic_threshold=self.semantic_threshold,
+                                cache_ttl=self.cache_ttl)
+                      for model in self.models]
+        return list(await asyncio.gather(*(generator.agenerate_tests(on_chunk) for generator in generators)))
+
+    def __write_output_file(self, path: Path, content: str) -> bool:
+        """
+        Write the content to a file in a single unbuffered write.
+
+        Encoding once and issuing one os.write avoids the buffered text
+        writer's chunked encode/flush cycle for multi-KB LLM outputs.
+
+        Args:
+            path (Path): The destination file.
+            content (str): The content to write.
+
+        Returns:
+            bool: True on success, False if the write failed (with the error
+            panel already printed).
+        """
+        try:
+            data = content.encode('utf-8')
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            self.console.print(
+                Panel(f"[bold red]Error:[/bold red] Unable to write to file: {path}\n{str(e)}",
+                      title="File Write Error", expand=False))
+            return False
+        self.console.print(Panel(f"Result written to [bold green]{path}[/bold green]",
+                                 title="Success", expand=False))
+        return True
+
+    def __output_model_result(self, model: ModelType, processed_content: str):
+        """
+        Output one model's result in multi-model comparison mode.
+
+        When an output path is configured, the model value is appended to the
+        file stem so each model writes its own file; otherwise the result is
+        printed to the console under the model's name.
+
+        Args:
+            model (ModelType): The model that produced the content.
+            processed_content (str): The content to be output.
+        """
+        if self.output_path:
+            model_path = self.output_path.with_stem(f"{self.output_path.stem}.{model.value}")
+            self.__write_output_file(model_path, processed_content)
+        else:
+            self.console.print(Panel(processed_content, title=model.value, expand=False))
 
     def __output_result(self, processed_content: str):
         """
@@ -156,20 +382,9 @@ class TestProcessor:
 
         Args:
             processed_content (str): The content to be output.
-
-        Raises:
-            IOError: If there's an error writing to the output file.
         """
         if self.output_path:
-            try:
-                with open(self.output_path, 'w') as file:
-                    file.write(processed_content)
-                self.console.print(Panel(f"Result written to [bold green]{self.output_path}[/bold green]",
-                                         title="Success", expand=False))
-            except IOError as e:
-                self.console.print(
-                    Panel(f"[bold red]Error:[/bold red] Unable to write to file: {self.output_path}\n{str(e)}",
-                          title="File Write Error", expand=False))
+            if not self.__write_output_file(self.output_path, processed_content):
                 self.__copy_to_clipboard(processed_content)
         else:
             self.__copy_to_clipboard(processed_content)
@@ -184,11 +399,21 @@ class TestProcessor:
         Raises:
             Exception: If there's an error copying to the clipboard.
         """
+        if len(content) > _CLIPBOARD_MAX_CHARS:
+            with tempfile.NamedTemporaryFile('w', suffix=".txt", prefix="ai-test-cli-",
+                                             delete=False) as file:
+                file.write(content)
+            self.console.print(Panel(f"Result too large for the clipboard; "
+                                     f"written to [bold green]{file.name}[/bold green]",
+                                     title="Output", expand=False))
+            return
         try:
-            pyperclip.copy(content)
+            _clipboard_copy()(content)
             self.console.print(f"[green]Result copied to clipboard...")
         except Exception as e:
             self.console.print(Panel(f"[bold red]Error:[/bold red] Unable to copy to clipboard\n{str(e)}",
                                      title="Clipboard Error", expand=False))
             self.console.print(Panel("Result:", title="Output", expand=False))
-            self.console.print(content)
+            # Raw LLM output: skip markup and highlight passes, which would
+            # otherwise tokenize tens of KB of code (and mangle any [brackets]).
+            self.console.print(content, markup=False, highlight=False)